@@ -2,8 +2,9 @@ from pathlib import Path
 from typing import List, Tuple
 from hst.components import Blob
 from hst.repo import get_repo_paths, HST_DIRNAME
-from hst.repo.index import read_index, write_index
+from hst.repo.index import read_index, write_index, read_stat_cache, write_stat_cache
 from hst.repo.worktree import scan_working_tree
+import os
 import sys
 
 
@@ -30,20 +31,29 @@ def run(paths: List[str]):
         paths, repo_root, hst_dir
     )
     staged_entries = read_index(hst_dir)
+    stat_cache = read_stat_cache(hst_dir)
 
-    # Stage file additions/modifications
+    # Stage file additions/modifications, recording each file's stat
+    # signature so later scans can skip re-hashing it while it's unchanged.
+    # The stat is taken before the read (as the scan path does): if the
+    # file changes in between, the cached signature is stale and the next
+    # scan re-hashes, instead of pairing a fresh signature with an old OID.
     for file_path in files_to_add:
+        stat = file_path.stat()
         blob = Blob(file_path.read_bytes())
         oid = blob.oid()
-        rel_path = file_path.relative_to(repo_root)
-        staged_entries[str(rel_path)] = oid
+        rel_path = str(file_path.relative_to(repo_root))
+        staged_entries[rel_path] = oid
+        stat_cache[rel_path] = [stat.st_mtime_ns, stat.st_size, stat.st_ino, oid]
 
     # Stage file deletions
     for deleted_path in files_to_delete:
         if deleted_path in staged_entries:
             del staged_entries[deleted_path]
+        stat_cache.pop(deleted_path, None)
 
     write_index(hst_dir, staged_entries)
+    write_stat_cache(hst_dir, stat_cache)
 
     total_changes = len(files_to_add) + len(files_to_delete)
     if files_to_add:
@@ -82,14 +92,14 @@ def collect_files_and_deletions(
             if abs_path.is_file():
                 files_to_add.append(abs_path)
             elif abs_path.is_dir():
-                # recursively add files
-                files_to_add.extend(
-                    [
-                        f
-                        for f in abs_path.rglob("*")
-                        if f.is_file() and HST_DIRNAME not in f.parts
-                    ]
-                )
+                # Recursively add files; pruning .hst from dirnames keeps
+                # the walk out of the object store entirely
+                for dirpath, dirnames, filenames in os.walk(abs_path):
+                    if HST_DIRNAME in dirnames:
+                        dirnames.remove(HST_DIRNAME)
+                    files_to_add.extend(
+                        Path(os.path.join(dirpath, name)) for name in filenames
+                    )
         else:
             # Path doesn't exist - check if it's a deletion
             try:
@@ -120,8 +130,12 @@ def _add_all():
     # Get current index
     staged_entries = read_index(hst_dir)
 
-    # Scan working directory for all files using shared function
-    worktree_files = scan_working_tree(repo_root)
+    # Scan working directory for all files using shared function; the stat
+    # cache lets clean files keep their cached OID without re-hashing
+    stat_cache = read_stat_cache(hst_dir)
+    worktree_files = scan_working_tree(repo_root, stat_cache=stat_cache)
+    stat_cache = {p: st for p, st in stat_cache.items() if p in worktree_files}
+    write_stat_cache(hst_dir, stat_cache)
 
     # Find all paths that exist in either working directory or index
     all_paths = set(worktree_files.keys()) | set(staged_entries.keys())
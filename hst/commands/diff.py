@@ -4,7 +4,7 @@ from pathlib import Path
 from typing import List, Dict, Optional
 from hst.repo import get_repo_paths
 from hst.repo.head import get_current_commit_oid
-from hst.repo.index import read_index
+from hst.repo.index import read_index, read_stat_cache, write_stat_cache
 from hst.repo.objects import read_object
 from hst.repo.worktree import read_tree_recursive, scan_working_tree
 from hst.repo.refs import resolve_commit_ref
@@ -51,11 +51,20 @@ def _diff_worktree_vs_index(repo_root: Path, hst_dir: Path):
     print(f"{BOLD}diff --hst a/index b/worktree{RESET}")
 
     index = read_index(hst_dir)
-    worktree = scan_working_tree(repo_root)
+    worktree = _scan_worktree_with_stat_cache(repo_root, hst_dir)
 
     _show_diff_between_trees("index", index, "worktree", worktree, hst_dir, repo_root)
 
 
+def _scan_worktree_with_stat_cache(repo_root: Path, hst_dir: Path) -> Dict[str, str]:
+    """Scan the working tree, skipping re-hashes via the stat cache."""
+    stat_cache = read_stat_cache(hst_dir)
+    worktree = scan_working_tree(repo_root, stat_cache=stat_cache)
+    stat_cache = {p: st for p, st in stat_cache.items() if p in worktree}
+    write_stat_cache(hst_dir, stat_cache)
+    return worktree
+
+
 def _diff_index_vs_head(repo_root: Path, hst_dir: Path):
     """Show differences between index and HEAD."""
     print(f"{BOLD}diff --hst a/HEAD b/index{RESET}")
@@ -94,7 +103,7 @@ def _diff_worktree_vs_commit(repo_root: Path, hst_dir: Path, commit_ref: str):
         sys.exit(1)
 
     commit_tree = read_tree_recursive(hst_dir, commit_obj.tree)
-    worktree = scan_working_tree(repo_root)
+    worktree = _scan_worktree_with_stat_cache(repo_root, hst_dir)
 
     _show_diff_between_trees(
         commit_oid[:7], commit_tree, "worktree", worktree, hst_dir, repo_root
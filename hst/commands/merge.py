@@ -1,20 +1,26 @@
+import re
 import sys
 from pathlib import Path
 from typing import List, Dict, Optional
 from hst.repo import get_repo_paths
 from hst.repo.head import get_current_commit_oid, get_current_branch, update_head
-from hst.repo.index import read_index, write_index
-from hst.repo.objects import read_object
-from hst.repo.refs import resolve_commit_ref
+from hst.repo.index import read_index, write_index, read_stat_cache, write_stat_cache
+from hst.repo.objects import read_object, apply_changes_to_tree, build_tree
+from hst.repo.refs import resolve_commit_ref, find_merge_base
 from hst.repo.worktree import (
     read_tree_recursive,
     checkout_commit,
     clear_working_directory,
     restore_files_from_tree,
+    apply_tree_diff_to_worktree,
     scan_working_tree,
 )
 from hst.components import Commit, Blob, Tree
 
+# Both markers must be present, in order, for a file to count as unresolved.
+# One compiled pattern scans the file bytes in a single pass.
+_CONFLICT_MARKERS_RE = re.compile(rb"<<<<<<< HEAD.*>>>>>>> MERGE_HEAD", re.DOTALL)
+
 
 def run(argv: List[str]):
     """
@@ -81,40 +87,6 @@ def run(argv: List[str]):
         )
 
 
-def find_merge_base(hst_dir: Path, commit1_oid: str, commit2_oid: str) -> Optional[str]:
-    """Find the merge base (common ancestor) of two commits."""
-    # Simple implementation: BFS to find first common ancestor
-    visited1 = set()
-    visited2 = set()
-    queue1 = [commit1_oid]
-    queue2 = [commit2_oid]
-
-    while queue1 or queue2:
-        # Process commits from first branch
-        if queue1:
-            current = queue1.pop(0)
-            if current in visited2:
-                return current
-            if current not in visited1:
-                visited1.add(current)
-                commit_obj = read_object(hst_dir, current, Commit, store=False)
-                if commit_obj:
-                    queue1.extend(commit_obj.parents)
-
-        # Process commits from second branch
-        if queue2:
-            current = queue2.pop(0)
-            if current in visited1:
-                return current
-            if current not in visited2:
-                visited2.add(current)
-                commit_obj = read_object(hst_dir, current, Commit, store=False)
-                if commit_obj:
-                    queue2.extend(commit_obj.parents)
-
-    return None
-
-
 def perform_fast_forward_merge(
     repo_root: Path, hst_dir: Path, target_commit_oid: str, target: str
 ):
@@ -143,19 +115,44 @@ def perform_three_way_merge(
     """Perform a three-way merge."""
     print("Merge made by the 'recursive' strategy.")
 
+    # Read just the three commit objects first; the degenerate cases below
+    # can be decided from the root tree OIDs without walking any trees.
+    base_commit = read_object(hst_dir, base_oid, Commit, store=False)
+    current_commit = read_object(hst_dir, current_oid, Commit, store=False)
+    target_commit = read_object(hst_dir, target_oid, Commit, store=False)
+
+    if current_commit.tree == target_commit.tree:
+        # Both sides arrived at the identical tree; nothing to merge
+        _create_merge_commit(
+            hst_dir, current_commit.tree, current_oid, target_oid, target, current_branch
+        )
+        return
+
+    if base_commit.tree == target_commit.tree:
+        # Only our side changed; the result is the current tree verbatim
+        _create_merge_commit(
+            hst_dir, current_commit.tree, current_oid, target_oid, target, current_branch
+        )
+        return
+
+    if base_commit.tree == current_commit.tree:
+        # Only their side changed; take the target tree wholesale
+        target_tree = read_tree_recursive(hst_dir, target_commit.tree)
+        clear_working_directory(repo_root)
+        restore_files_from_tree(hst_dir, repo_root, target_tree)
+        write_index(hst_dir, target_tree)
+        _create_merge_commit(
+            hst_dir, target_commit.tree, current_oid, target_oid, target, current_branch
+        )
+        return
+
     # Get tree mappings for all three commits
-    base_tree = read_tree_recursive(
-        hst_dir, read_object(hst_dir, base_oid, Commit, store=False).tree
-    )
-    current_tree = read_tree_recursive(
-        hst_dir, read_object(hst_dir, current_oid, Commit, store=False).tree
-    )
-    target_tree = read_tree_recursive(
-        hst_dir, read_object(hst_dir, target_oid, Commit, store=False).tree
-    )
+    base_tree = read_tree_recursive(hst_dir, base_commit.tree)
+    current_tree = read_tree_recursive(hst_dir, current_commit.tree)
+    target_tree = read_tree_recursive(hst_dir, target_commit.tree)
 
     # Perform the merge
-    merged_tree, conflicts = merge_trees(
+    merged_tree, changes, conflicts = merge_trees(
         hst_dir, repo_root, base_tree, current_tree, target_tree
     )
 
@@ -168,38 +165,54 @@ def perform_three_way_merge(
         write_index(hst_dir, merged_tree)
 
         # Write conflict files to working tree
-        write_conflicts_to_worktree(repo_root, hst_dir, merged_tree, conflicts)
+        write_conflicts_to_worktree(repo_root, conflicts)
         sys.exit(1)
     else:
         # Successful merge - create merge commit
-        # Update working tree first
-        clear_working_directory(repo_root)
-        restore_files_from_tree(hst_dir, repo_root, merged_tree)
+        # Update only the files the merge actually changed
+        apply_tree_diff_to_worktree(hst_dir, repo_root, current_tree, merged_tree)
 
         # Update index
         write_index(hst_dir, merged_tree)
 
-        # Create merge commit
-        message = f"Merge branch '{target}'"
-        if current_branch and target != current_branch:
-            message = f"Merge branch '{target}' into {current_branch}"
-
-        # Get current user info (simplified)
-        author = "User"  # TODO: Get from config
-
-        # Create commit with two parents
-        commit_obj = Commit(
-            tree=create_tree_from_index(hst_dir, merged_tree),
-            parents=[current_oid, target_oid],
-            author=author,
-            committer=author,
-            message=message,
-            store=True,
+        # Build the merged tree by patching the current commit's tree with
+        # just the changed paths; unchanged subtrees are reused by OID.
+        tree_oid = apply_changes_to_tree(hst_dir, current_commit.tree, changes)
+        if tree_oid is None:
+            tree_oid = Tree([]).oid()
+
+        _create_merge_commit(
+            hst_dir, tree_oid, current_oid, target_oid, target, current_branch
         )
 
-        # Update HEAD
-        update_head(hst_dir, commit_obj.oid())
-        print(f"Merge commit {commit_obj.oid()[:7]} created.")
+
+def _create_merge_commit(
+    hst_dir: Path,
+    tree_oid: str,
+    current_oid: str,
+    target_oid: str,
+    target: str,
+    current_branch: Optional[str],
+):
+    """Create a two-parent merge commit for tree_oid and advance HEAD."""
+    message = f"Merge branch '{target}'"
+    if current_branch and target != current_branch:
+        message = f"Merge branch '{target}' into {current_branch}"
+
+    # Get current user info (simplified)
+    author = "User"  # TODO: Get from config
+
+    commit_obj = Commit(
+        tree=tree_oid,
+        parents=[current_oid, target_oid],
+        author=author,
+        committer=author,
+        message=message,
+        store=True,
+    )
+
+    update_head(hst_dir, commit_obj.oid())
+    print(f"Merge commit {commit_obj.oid()[:7]} created.")
 
 
 def merge_trees(
@@ -208,10 +221,18 @@ def merge_trees(
     base_tree: Dict[str, str],
     current_tree: Dict[str, str],
     target_tree: Dict[str, str],
-) -> tuple[Dict[str, str], List[str]]:
-    """Merge three trees and return the result plus any conflicts."""
+) -> tuple[Dict[str, str], Dict[str, Optional[str]], Dict[str, bytes]]:
+    """Merge three trees and return the result plus changes and any conflicts.
+
+    changes maps each path whose merged content differs from current_tree to
+    its new blob OID (None for a deletion), so the merged tree object can be
+    built by patching the current tree instead of rebuilding it from scratch.
+    conflicts maps each conflicted path to its conflict-marker content, so
+    callers can write the markers out without re-reading the stored blob.
+    """
     merged_tree = {}
-    conflicts = []
+    changes = {}
+    conflicts = {}
 
     # Get all files that exist in any tree
     all_files = (
@@ -230,6 +251,7 @@ def merge_trees(
                 merged_tree[file_path] = current_oid
         elif base_oid == current_oid:
             # Only target changed
+            changes[file_path] = target_oid
             if target_oid:
                 merged_tree[file_path] = target_oid
         elif base_oid == target_oid:
@@ -246,12 +268,15 @@ def merge_trees(
                 hst_dir, file_path, current_oid, target_oid
             )
 
-            # Store conflicted content as a new blob
-            conflict_blob = Blob(conflict_content.encode("utf-8"), store=True)
+            # Store conflicted content as a new blob. hashlib.sha1 hashes the
+            # whole buffer in one native call, so no chunked Python loop here.
+            conflict_bytes = conflict_content.encode("utf-8")
+            conflict_blob = Blob(conflict_bytes, store=True)
             merged_tree[file_path] = conflict_blob.oid()
-            conflicts.append(file_path)
+            changes[file_path] = conflict_blob.oid()
+            conflicts[file_path] = conflict_bytes
 
-    return merged_tree, conflicts
+    return merged_tree, changes, conflicts
 
 
 def create_conflict_markers(
@@ -285,20 +310,8 @@ def create_conflict_markers(
     return conflict_content
 
 
-def create_tree_from_index(hst_dir: Path, index: Dict[str, str]) -> str:
-    """Create a tree object from the current index."""
-    # Create tree with all files in root directory (simplified)
-    entries = []
-    for file_path, blob_oid in sorted(index.items()):
-        # For simplicity, treat all files as regular files in root
-        entries.append(("100644", file_path, blob_oid))
-
-    tree_obj = Tree(entries, store=True)
-    return tree_obj.oid()
-
-
 def write_merge_state(
-    hst_dir: Path, current_oid: str, target_oid: str, conflicts: List[str]
+    hst_dir: Path, current_oid: str, target_oid: str, conflicts: Dict[str, bytes]
 ):
     """Write merge state files for conflict resolution."""
     # Write MERGE_HEAD
@@ -321,10 +334,11 @@ def abort_merge():
         print("error: no merge in progress")
         sys.exit(1)
 
-    # Reset to original state
+    # Reset to original state; force a full rebuild so conflict-marker
+    # files the index doesn't know about are discarded too
     original_commit = get_current_commit_oid(hst_dir)
     if original_commit:
-        checkout_commit(hst_dir, repo_root, original_commit)
+        checkout_commit(hst_dir, repo_root, original_commit, force=True)
 
     # Clean up merge state files
     merge_head_file.unlink()
@@ -351,9 +365,8 @@ def continue_merge():
     for file_path, blob_oid in index.items():
         file_full_path = repo_root / file_path
         if file_full_path.exists():
-            with open(file_full_path, "r") as f:
-                content = f.read()
-                if "<<<<<<< HEAD" in content and ">>>>>>> MERGE_HEAD" in content:
+            with open(file_full_path, "rb") as f:
+                if _CONFLICT_MARKERS_RE.search(f.read()):
                     conflicts_remaining.append(file_path)
 
     if conflicts_remaining:
@@ -376,14 +389,24 @@ def continue_merge():
     # Get author info
     author = "User"  # TODO: Get from config
 
-    # Update index with current working tree
-    current_worktree = scan_working_tree(repo_root, store_blobs=True)
+    # Update index with current working tree. The stat cache lets us skip
+    # re-hashing files that haven't changed since they were last hashed --
+    # after a conflict resolution that's everything except the resolved files.
+    stat_cache = read_stat_cache(hst_dir)
+    current_worktree = scan_working_tree(
+        repo_root, store_blobs=True, stat_cache=stat_cache
+    )
     write_index(hst_dir, current_worktree)
 
-    # Create merge commit
-    tree_oid = create_tree_from_index(hst_dir, current_worktree)
+    # Drop cache entries for files that no longer exist
+    stat_cache = {p: st for p, st in stat_cache.items() if p in current_worktree}
+    write_stat_cache(hst_dir, stat_cache)
+
+    # Create merge commit. build_tree produces the same nested tree shape
+    # as commit, so paths resolve identically whichever command made them.
+    tree = build_tree(repo_root, current_worktree)
     commit_obj = Commit(
-        tree=tree_oid,
+        tree=tree.oid(),
         parents=[current_oid, target_oid],
         author=author,
         committer=author,
@@ -402,17 +425,16 @@ def continue_merge():
     print(f"Merge commit {commit_obj.oid()[:7]} created.")
 
 
-def write_conflicts_to_worktree(
-    repo_root: Path, hst_dir: Path, merged_tree: Dict[str, str], conflicts: List[str]
-):
+def write_conflicts_to_worktree(repo_root: Path, conflicts: Dict[str, bytes]):
     """Write conflict files with markers to the working tree."""
-    for file_path in conflicts:
-        blob_oid = merged_tree[file_path]
-        blob_obj = read_object(hst_dir, blob_oid, Blob, store=False)
-        if blob_obj:
-            file_full_path = repo_root / file_path
-            # Ensure parent directories exist
-            file_full_path.parent.mkdir(parents=True, exist_ok=True)
-            # Write the conflict content to the file
-            with open(file_full_path, "wb") as f:
-                f.write(blob_obj.data)
+    # Create each needed parent directory once up front, instead of paying
+    # the mkdir(parents=True) stat calls for every file in the same directory
+    parent_dirs = {(repo_root / file_path).parent for file_path in conflicts}
+    for parent_dir in sorted(parent_dirs, key=lambda d: len(d.parts)):
+        parent_dir.mkdir(parents=True, exist_ok=True)
+
+    for file_path, conflict_bytes in conflicts.items():
+        file_full_path = repo_root / file_path
+        # Write the conflict content to the file
+        with open(file_full_path, "wb") as f:
+            f.write(conflict_bytes)
@@ -3,7 +3,7 @@ from pathlib import Path
 from typing import List
 from hst.repo import get_repo_paths
 from hst.repo.config import get_remote_url
-from hst.repo.head import get_current_branch, get_current_commit_oid
+from hst.repo.head import get_current_branch, get_current_commit_oid, invalidate_head_cache
 from hst.repo.refs import is_ancestor
 from hst.repo.worktree import checkout_from_commit
 from hst.commands import fetch
@@ -100,6 +100,7 @@ def _fast_forward_to(
     except OSError as e:
         print(f"error: failed to update branch {branch_name}: {e}")
         sys.exit(1)
+    invalidate_head_cache(hst_dir)
 
     # Update HEAD
     head_file = hst_dir / "HEAD"
@@ -108,6 +109,7 @@ def _fast_forward_to(
     except OSError as e:
         print(f"error: failed to update HEAD: {e}")
         sys.exit(1)
+    invalidate_head_cache(hst_dir)
 
     # Update working tree
     try:
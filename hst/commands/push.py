@@ -3,7 +3,7 @@ from pathlib import Path
 from typing import List
 from hst.repo import get_repo_paths, validate_repository, copy_objects_to_repository
 from hst.repo.config import get_remote_url
-from hst.repo.head import get_current_branch
+from hst.repo.head import get_current_branch, invalidate_head_cache
 from hst.repo.refs import resolve_commit_ref
 
 
@@ -124,6 +124,8 @@ def _push_to_remote(
     except OSError as e:
         print(f"error: failed to update remote ref: {e}")
         return False
+    # The remote's HEAD may point at this branch; drop any cached read of it
+    invalidate_head_cache(remote_hst_dir)
 
     # Update local remote tracking branch
     local_remote_branch_path = hst_dir / "refs" / "remotes" / remote_name / remote_ref
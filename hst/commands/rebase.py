@@ -2,8 +2,8 @@ import sys
 from pathlib import Path
 from typing import List, Optional
 from hst.repo import get_repo_paths
-from hst.repo.head import get_current_branch
-from hst.repo.refs import resolve_commit_ref, is_ancestor
+from hst.repo.head import get_current_branch, invalidate_head_cache
+from hst.repo.refs import resolve_commit_ref, is_ancestor, find_merge_base
 from hst.repo.objects import read_object
 from hst.repo.worktree import checkout_from_commit
 from hst.components import Commit
@@ -44,6 +44,7 @@ def run(argv: List[str]):
         # Update HEAD to point to target branch
         head_file = hst_dir / "HEAD"
         head_file.write_text(f"ref: refs/heads/{target_branch}\n")
+        invalidate_head_cache(hst_dir)
 
     # Resolve commits
     upstream_commit = resolve_commit_ref(hst_dir, upstream)
@@ -74,7 +75,7 @@ def run(argv: List[str]):
         return
 
     # Find merge base
-    merge_base = _find_merge_base(hst_dir, upstream_commit, target_commit)
+    merge_base = find_merge_base(hst_dir, upstream_commit, target_commit)
     if not merge_base:
         print("fatal: no merge base found")
         sys.exit(1)
@@ -96,6 +97,7 @@ def run(argv: List[str]):
     # Update branch ref
     target_branch_ref = hst_dir / "refs" / "heads" / target_branch
     target_branch_ref.write_text(new_head + "\n")
+    invalidate_head_cache(hst_dir)
 
     # Update working tree
     checkout_from_commit(hst_dir, repo_root, new_head)
@@ -110,49 +112,12 @@ def _fast_forward_branch(
     # Update branch reference
     branch_ref = hst_dir / "refs" / "heads" / branch_name
     branch_ref.write_text(target_commit + "\n")
+    invalidate_head_cache(hst_dir)
 
     # Update working tree
     checkout_from_commit(hst_dir, repo_root, target_commit)
 
 
-def _find_merge_base(hst_dir: Path, commit1: str, commit2: str) -> Optional[str]:
-    """Find the merge base (common ancestor) of two commits."""
-    # Simple implementation: BFS to find first common ancestor
-    visited1 = set()
-    visited2 = set()
-    queue1 = [commit1]
-    queue2 = [commit2]
-
-    while queue1 or queue2:
-        # Process queue1
-        if queue1:
-            current = queue1.pop(0)
-            if current in visited2:
-                return current
-            if current not in visited1:
-                visited1.add(current)
-                commit_obj = read_object(hst_dir, current, Commit, store=False)
-                if commit_obj and commit_obj.parents:
-                    for parent in commit_obj.parents:
-                        if parent and parent != "None":
-                            queue1.append(parent)
-
-        # Process queue2
-        if queue2:
-            current = queue2.pop(0)
-            if current in visited1:
-                return current
-            if current not in visited2:
-                visited2.add(current)
-                commit_obj = read_object(hst_dir, current, Commit, store=False)
-                if commit_obj and commit_obj.parents:
-                    for parent in commit_obj.parents:
-                        if parent and parent != "None":
-                            queue2.append(parent)
-
-    return None
-
-
 def _get_commits_to_rebase(
     hst_dir: Path, merge_base: str, target_commit: str
 ) -> List[str]:
@@ -1,3 +1,4 @@
+import os
 import sys
 from pathlib import Path
 from typing import List
@@ -5,7 +6,7 @@ from hst.repo import get_repo_paths
 from hst.repo.head import get_current_commit_oid
 from hst.repo.index import read_index, write_index
 from hst.repo.objects import read_object
-from hst.repo.worktree import read_tree_recursive
+from hst.repo.worktree import read_tree_recursive, tree_contains_path
 from hst.components import Commit, Blob
 
 
@@ -39,16 +40,21 @@ def run(argv: List[str]):
 
 def _restore_worktree(file_paths: List[str], repo_root: Path, hst_dir: Path):
     """Restore files from index to working tree (discard working tree changes)."""
-    # Get HEAD tree to check if files exist there
+    # Resolve the HEAD tree OID; individual paths are looked up in it lazily
+    # below, so restoring a few files never flattens the whole tree
     current_commit_oid = get_current_commit_oid(hst_dir)
-    head_tree = {}
+    head_tree_oid = None
     if current_commit_oid:
         commit_obj = read_object(hst_dir, current_commit_oid, Commit, store=False)
         if commit_obj:
-            head_tree = read_tree_recursive(hst_dir, commit_obj.tree)
+            head_tree_oid = commit_obj.tree
 
     index = read_index(hst_dir)
     restored_files = []
+    # Per-file work below sticks to str/os.path; Path stays at the
+    # argument-parsing boundary
+    repo_root_str = str(repo_root)
+    created_dirs = set()  # shared across pathspecs: one mkdir per directory
 
     for file_path_str in file_paths:
         # Convert to relative path from repo root
@@ -71,41 +77,61 @@ def _restore_worktree(file_paths: List[str], repo_root: Path, hst_dir: Path):
             )
             continue
 
-        # Restore each matching file
+        # Split by HEAD membership first: only files being written back
+        # need their parent directories; the removal branch must not
+        # leave empty directories behind
+        to_restore = []
+        to_remove = []
         for file_rel_path in matching_files:
-            full_path = repo_root / file_rel_path
-
-            # Check if file exists in HEAD
-            if file_rel_path in head_tree:
-                # File exists in HEAD - restore from index (which should match HEAD or be staged)
-                blob_oid = index[file_rel_path]
-                blob_obj = read_object(hst_dir, blob_oid, Blob, store=False)
-                if not blob_obj:
-                    print(f"error: cannot read blob {blob_oid} for {file_rel_path}")
-                    continue
-
-                # Write blob content to working tree
-                try:
-                    # Create parent directories if needed
-                    full_path.parent.mkdir(parents=True, exist_ok=True)
-                    full_path.write_bytes(blob_obj.data)
-                    restored_files.append(file_rel_path)
-                except OSError as e:
-                    print(f"error: cannot restore {file_rel_path}: {e}")
+            if head_tree_oid and tree_contains_path(
+                hst_dir, head_tree_oid, file_rel_path
+            ):
+                to_restore.append(file_rel_path)
             else:
-                # File doesn't exist in HEAD but is in index (new file)
-                # Remove it from working tree to match HEAD state
-                try:
-                    if full_path.exists():
-                        full_path.unlink()
-                        restored_files.append(file_rel_path)
-                except OSError as e:
-                    print(f"error: cannot remove {file_rel_path}: {e}")
+                to_remove.append(file_rel_path)
+
+        # Create each distinct parent directory once, instead of a
+        # mkdir(parents=True) round of stats per restored file
+        parent_dirs = {
+            os.path.dirname(os.path.join(repo_root_str, f)) for f in to_restore
+        } - created_dirs
+        for parent_dir in sorted(parent_dirs, key=len):
+            os.makedirs(parent_dir, exist_ok=True)
+        created_dirs |= parent_dirs
+
+        # Files in HEAD: restore from index (which should match HEAD or be staged)
+        for file_rel_path in to_restore:
+            full_path = os.path.join(repo_root_str, file_rel_path)
+            blob_oid = index[file_rel_path]
+            blob_obj = read_object(hst_dir, blob_oid, Blob, store=False)
+            if not blob_obj:
+                print(f"error: cannot read blob {blob_oid} for {file_rel_path}")
+                continue
+
+            # Write blob content to working tree in one write call
+            try:
+                with open(full_path, "wb") as f:
+                    f.write(blob_obj.data)
+                restored_files.append(file_rel_path)
+            except OSError as e:
+                print(f"error: cannot restore {file_rel_path}: {e}")
+
+        # Files not in HEAD but in the index (new files): remove from the
+        # working tree to match HEAD state
+        for file_rel_path in to_remove:
+            full_path = os.path.join(repo_root_str, file_rel_path)
+            try:
+                if os.path.exists(full_path):
+                    os.remove(full_path)
+                    restored_files.append(file_rel_path)
+            except OSError as e:
+                print(f"error: cannot remove {file_rel_path}: {e}")
 
     if restored_files:
-        print(f"Restored {len(restored_files)} file(s) from index to working tree:")
-        for file_path in restored_files:
-            print(f"  {file_path}")
+        # One write for the whole report instead of a print per file
+        out = [f"Restored {len(restored_files)} file(s) from index to working tree:\n"]
+        out.extend(f"  {file_path}\n" for file_path in restored_files)
+        sys.stdout.write("".join(out))
 
 
 def _restore_staged(file_paths: List[str], repo_root: Path, hst_dir: Path):
@@ -164,9 +190,9 @@ def _restore_staged(file_paths: List[str], repo_root: Path, hst_dir: Path):
     write_index(hst_dir, index)
 
     if restored_files:
-        print(f"Unstaged {len(restored_files)} file(s):")
-        for file_status in restored_files:
-            print(f"  {file_status}")
+        out = [f"Unstaged {len(restored_files)} file(s):\n"]
+        out.extend(f"  {file_status}\n" for file_status in restored_files)
+        sys.stdout.write("".join(out))
 
 
 def _find_matching_files(index: dict, path_spec: str) -> List[str]:
@@ -1,15 +1,12 @@
+import sys
 from pathlib import Path
 from typing import Dict, List, Tuple
 from hst.repo import get_repo_paths
 from hst.repo.head import get_current_commit_oid, get_current_branch
-from hst.repo.index import read_index
+from hst.repo.index import read_index, read_stat_cache, write_stat_cache
 from hst.repo.objects import read_object
 from hst.repo.worktree import read_tree_recursive, scan_working_tree
-from hst.repo.utils import (
-    parse_path_arguments,
-    filter_dict_by_paths,
-    path_matches_filter,
-)
+from hst.repo.utils import parse_path_arguments, build_pathspec_matcher
 from hst.components import Commit
 from hst.colors import RED, GREEN, RESET
 
@@ -25,31 +22,38 @@ def run(argv: List[str]):
 
     branch, head_tree = _get_branch_and_head_tree(hst_dir)
     index = read_index(hst_dir)
-    worktree = scan_working_tree(repo_root, filter_paths)
 
-    # Filter other collections by paths if specified
-    if filter_paths:
-        head_tree = filter_dict_by_paths(head_tree, filter_paths, path_matches_filter)
-        index = filter_dict_by_paths(index, filter_paths, path_matches_filter)
+    # The stat cache turns repeat scans into a stat + dict lookup per file;
+    # only files modified since the last scan get re-read and re-hashed
+    stat_cache = read_stat_cache(hst_dir)
+    worktree = scan_working_tree(repo_root, filter_paths, stat_cache=stat_cache)
+    if not filter_paths:
+        # Full scan: drop cache entries for files that no longer exist
+        stat_cache = {p: st for p, st in stat_cache.items() if p in worktree}
+    write_stat_cache(hst_dir, stat_cache)
 
-    staged, unstaged, untracked = _classify_changes(head_tree, index, worktree)
+    # Any path filter is applied inside the classification pass itself,
+    # rather than building filtered copies of the dicts first
+    matcher = build_pathspec_matcher(filter_paths) if filter_paths else None
+    staged, unstaged, untracked = _classify_changes(head_tree, index, worktree, matcher)
 
-    print(f"On branch {branch}")
+    # Assemble the report and emit it with a single write, rather than one
+    # line-buffered print per path
+    out = [f"On branch {branch}\n"]
 
     if staged:
-        print("\nChanges to be committed:")
-        for path, change in staged:
-            print(f"{GREEN}    {change}:   {path}{RESET}")
+        out.append("\nChanges to be committed:\n")
+        out.extend(f"{GREEN}    {change}:   {path}{RESET}\n" for path, change in staged)
 
     if unstaged:
-        print("\nChanges not staged for commit:")
-        for path, change in unstaged:
-            print(f"{RED}    {change}:   {path}{RESET}")
+        out.append("\nChanges not staged for commit:\n")
+        out.extend(f"{RED}    {change}:   {path}{RESET}\n" for path, change in unstaged)
 
     if untracked:
-        print("\nUntracked files:")
-        for path in untracked:
-            print(f"{RED}    {path}{RESET}")
+        out.append("\nUntracked files:\n")
+        out.extend(f"{RED}    {path}{RESET}\n" for path in untracked)
+
+    sys.stdout.write("".join(out))
 
 
 def _get_branch_and_head_tree(hst_dir: Path) -> Dict[str, str]:
@@ -74,39 +78,54 @@ def _classify_changes(
     head: Dict[str, str],
     index: Dict[str, str],
     work: Dict[str, str],
+    matcher=None,
 ) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]], List[str]]:
     """
     Compare HEAD ↔ index ↔ working tree.
     Returns (staged, unstaged, untracked).
     Each staged/unstaged entry is (path, change_type).
+    If matcher is given, paths it rejects are skipped.
     """
     staged = []
     unstaged = []
     untracked = []
 
-    paths = set(head) | set(index) | set(work)
-
-    for path in sorted(paths):
-        head_oid = head.get(path)
-        index_oid = index.get(path)
-        work_oid = work.get(path)
-
-        # --- staged ---
-        if index_oid != head_oid:
-            if head_oid is None:
-                staged.append((path, "new file"))
-            elif index_oid is None:
-                staged.append((path, "deleted"))
-            else:
-                staged.append((path, "modified"))
-
-        # --- unstaged ---
-        if work_oid != index_oid:
-            if index_oid is None and work_oid is not None:
+    # Pairwise passes over the mappings themselves: no union set of every
+    # known path is materialized, and on a clean repo each pass is a pure
+    # dict-lookup loop that appends nothing. Deletions come from C-level
+    # key-view differences, and the matcher runs only over the (small)
+    # result lists rather than once per known path.
+    head_get = head.get
+    index_get = index.get
+
+    # --- staged: index vs HEAD ---
+    for path, index_oid in index.items():
+        head_oid = head_get(path)
+        if head_oid != index_oid:
+            staged.append((path, "new file" if head_oid is None else "modified"))
+    for path in head.keys() - index.keys():
+        staged.append((path, "deleted"))
+
+    # --- unstaged: working tree vs index ---
+    for path, work_oid in work.items():
+        index_oid = index_get(path)
+        if index_oid != work_oid:
+            if index_oid is None:
                 untracked.append(path)
-            elif work_oid is None and index_oid is not None:
-                unstaged.append((path, "deleted"))
-            elif work_oid is not None and index_oid is not None:
+            else:
                 unstaged.append((path, "modified"))
+    for path in index.keys() - work.keys():
+        unstaged.append((path, "deleted"))
+
+    if matcher:
+        staged = [entry for entry in staged if matcher(entry[0])]
+        unstaged = [entry for entry in unstaged if matcher(entry[0])]
+        untracked = [path for path in untracked if matcher(path)]
+
+    # Only the output needs ordering for display; sorting the (usually much
+    # smaller) result lists beats sorting the union of every known path
+    staged.sort()
+    unstaged.sort()
+    untracked.sort()
 
     return staged, unstaged, untracked
@@ -2,7 +2,7 @@ import sys
 from pathlib import Path
 from typing import List
 from hst.repo import get_repo_paths
-from hst.repo.head import get_current_commit_oid, get_current_branch
+from hst.repo.head import get_current_commit_oid, get_current_branch, invalidate_head_cache
 from hst.repo.worktree import check_for_staged_changes, checkout_commit
 
 
@@ -44,6 +44,7 @@ def _switch_branch(hst_dir: Path, name: str):
 
     # Update HEAD
     (hst_dir / "HEAD").write_text(f"ref: refs/heads/{name}")
+    invalidate_head_cache(hst_dir)
     print(f"Switched to branch '{name}'")
 
 
@@ -68,6 +69,7 @@ def _create_and_switch(hst_dir: Path, name: str):
 
     # Update HEAD
     (hst_dir / "HEAD").write_text(f"ref: refs/heads/{name}")
+    invalidate_head_cache(hst_dir)
     print(f"Created and switched to branch '{name}' at {commit_hash[:7]}")
 
 
@@ -1,3 +1,3 @@
-from .hst_objects import Object, Blob, Tree, Commit, Tag
+from .hst_objects import Object, Blob, Tree, Commit, Tag, hash_blob_bytes
 
-__all__ = ["Object", "Blob", "Tree", "Commit", "Tag"]
+__all__ = ["Object", "Blob", "Tree", "Commit", "Tag", "hash_blob_bytes"]
@@ -9,8 +9,13 @@ from .repo import (
     copy_single_object,
 )
 from .worktree import checkout_commit, checkout_from_commit, check_for_staged_changes
-from .refs import resolve_commit_ref, is_ancestor
-from .utils import parse_path_arguments, filter_dict_by_paths, path_matches_filter
+from .refs import resolve_commit_ref, is_ancestor, find_merge_base
+from .utils import (
+    parse_path_arguments,
+    filter_dict_by_paths,
+    path_matches_filter,
+    build_pathspec_matcher,
+)
 from .config import add_remote, remove_remote, list_remotes, get_remote_url
 
 __all__ = [
@@ -27,9 +32,11 @@ __all__ = [
     "check_for_staged_changes",
     "resolve_commit_ref",
     "is_ancestor",
+    "find_merge_base",
     "parse_path_arguments",
     "filter_dict_by_paths",
     "path_matches_filter",
+    "build_pathspec_matcher",
     "add_remote",
     "remove_remote",
     "list_remotes",
@@ -1,9 +1,24 @@
 import configparser
+import io
+import os
+import re
 import shutil
+import sys
 from pathlib import Path
 from typing import Dict, Optional
 
 
+# Matches section names like 'remote "origin"', capturing the remote name;
+# compiled once and shared by every remote-section scan
+_REMOTE_SECTION_RE = re.compile(r'^remote "(.+)"$')
+
+
+# Parsed configs keyed by path, validated against (mtime_ns, size) so an
+# out-of-band edit is picked up. Several commands read the config more
+# than once per run; cache hits skip both the disk read and the parse.
+_config_cache: Dict[str, tuple] = {}
+
+
 def get_config_path(hst_dir: Path) -> Path:
     """Get the path to the config file."""
     return hst_dir / "config"
@@ -13,16 +28,54 @@ def read_config(hst_dir: Path) -> configparser.ConfigParser:
     """Read the repository config file."""
     config = configparser.ConfigParser()
     config_path = get_config_path(hst_dir)
-    if config_path.exists():
+    key = str(config_path)
+
+    try:
+        stat = os.stat(key)
+    except OSError:
+        return config  # No config file yet
+
+    cached = _config_cache.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        source = cached[2]
+    else:
         config.read(config_path)
-    return config
+        _config_cache[key] = (stat.st_mtime_ns, stat.st_size, config)
+        source = config
+
+    # Hand out a fresh parser so callers can mutate their copy without
+    # poisoning the cache (add_remote etc. edit and re-write the config)
+    fresh = configparser.ConfigParser()
+    fresh.read_dict(source)
+    return fresh
 
 
 def write_config(hst_dir: Path, config: configparser.ConfigParser) -> None:
-    """Write the repository config file."""
+    """Write the repository config file.
+
+    Serializes to memory first and skips the disk write (and the cache
+    bust) when the rendered config matches what's already on disk, so
+    no-op updates like re-adding an existing remote cost nothing. Actual
+    writes land via a temp file and os.replace so a crash can't leave a
+    half-written config.
+    """
     config_path = get_config_path(hst_dir)
-    with open(config_path, "w") as f:
-        config.write(f)
+    buffer = io.StringIO()
+    config.write(buffer)
+    rendered = buffer.getvalue()
+
+    try:
+        with open(config_path, "r") as f:
+            if f.read() == rendered:
+                return
+    except OSError:
+        pass  # No config file yet (or unreadable): fall through and write
+
+    tmp_path = f"{config_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(rendered)
+    os.replace(tmp_path, config_path)
+    _config_cache.pop(str(config_path), None)
 
 
 def read_remotes(hst_dir: Path) -> Dict[str, str]:
@@ -36,12 +89,11 @@ def read_remotes(hst_dir: Path) -> Dict[str, str]:
     remotes = {}
 
     for section_name in config.sections():
-        if section_name.startswith('remote "') and section_name.endswith('"'):
-            # Extract remote name from section name like 'remote "origin"'
-            remote_name = section_name[8:-1]  # Remove 'remote "' and '"'
+        match = _REMOTE_SECTION_RE.match(section_name)
+        if match:
             section = config[section_name]
             if "url" in section:
-                remotes[remote_name] = section["url"]
+                remotes[match.group(1)] = section["url"]
 
     return remotes
 
@@ -57,10 +109,11 @@ def write_remotes(hst_dir: Path, remotes: Dict[str, str]) -> None:
     config = read_config(hst_dir)
 
     # Remove existing remote sections
-    sections_to_remove = []
-    for section_name in config.sections():
-        if section_name.startswith('remote "') and section_name.endswith('"'):
-            sections_to_remove.append(section_name)
+    sections_to_remove = [
+        section_name
+        for section_name in config.sections()
+        if _REMOTE_SECTION_RE.match(section_name)
+    ]
 
     for section_name in sections_to_remove:
         config.remove_section(section_name)
@@ -169,12 +222,15 @@ def list_remotes(hst_dir: Path, verbose: bool = False) -> None:
     if not remotes:
         return
 
+    # One buffered write instead of a print (lock + flush) per line
+    lines = []
     for name, url in sorted(remotes.items()):
         if verbose:
-            print(f"{name}\t{url} (fetch)")
-            print(f"{name}\t{url} (push)")
+            lines.append(f"{name}\t{url} (fetch)")
+            lines.append(f"{name}\t{url} (push)")
         else:
-            print(name)
+            lines.append(name)
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def get_remote_refs_dir(hst_dir: Path, remote_name: str) -> Path:
@@ -1,35 +1,64 @@
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 
-def get_current_commit_oid(hst_dir: Path) -> Optional[str]:
-    """Get the current commit OID that HEAD points to."""
-    head_path = hst_dir / "HEAD"
-    if not head_path.exists():
-        return None
+# Short-lived CLI commands re-read HEAD (and the ref it points to) several
+# times per run; memoizing the parse per process collapses those repeat
+# file reads. Keyed by hst_dir so operations on remote/clone repos don't
+# collide. Any code that writes HEAD or the current branch ref must call
+# invalidate_head_cache.
+_head_cache: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
 
-    head_contents = head_path.read_text().strip()
+
+def read_head(hst_dir: Path) -> Tuple[Optional[str], Optional[str]]:
+    """Read HEAD once and return (branch_name, commit_oid).
+
+    branch_name is None for a detached HEAD (or missing HEAD file);
+    commit_oid is None when HEAD doesn't resolve to a commit yet.
+    The result is cached for the lifetime of the process.
+    """
+    key = str(hst_dir)
+    cached = _head_cache.get(key)
+    if cached is not None:
+        return cached
+
+    branch = None
+    commit_oid = None
+    try:
+        with open(hst_dir / "HEAD") as f:
+            head_contents = f.read().strip()
+    except OSError:
+        head_contents = ""
     if head_contents.startswith("ref: "):
-        # HEAD points to a branch
-        ref_path = hst_dir / head_contents[5:]
-        if ref_path.exists():
-            return ref_path.read_text().strip() or None
-        return None
-    else:
+        # HEAD points to a branch; rsplit stops at the last separator
+        # instead of splitting the whole ref path
+        branch = head_contents.rsplit("/", 1)[-1]
+        try:
+            with open(hst_dir / head_contents[5:]) as f:
+                commit_oid = f.read().strip() or None
+        except OSError:
+            pass
+    elif head_contents:
         # Detached HEAD
-        return head_contents or None
+        commit_oid = head_contents
+
+    _head_cache[key] = (branch, commit_oid)
+    return branch, commit_oid
+
+
+def invalidate_head_cache(hst_dir: Path) -> None:
+    """Drop the cached HEAD state after HEAD or the current ref is rewritten."""
+    _head_cache.pop(str(hst_dir), None)
+
+
+def get_current_commit_oid(hst_dir: Path) -> Optional[str]:
+    """Get the current commit OID that HEAD points to."""
+    return read_head(hst_dir)[1]
 
 
 def get_current_branch(hst_dir: Path) -> Optional[str]:
     """Get the current branch name, or None if in detached HEAD."""
-    head_path = hst_dir / "HEAD"
-    if not head_path.exists():
-        return None
-
-    head_contents = head_path.read_text().strip()
-    if head_contents.startswith("ref: "):
-        return head_contents.split("/")[-1]
-    return None
+    return read_head(hst_dir)[0]
 
 
 def update_head(hst_dir: Path, commit_oid: str) -> None:
@@ -48,3 +77,5 @@ def update_head(hst_dir: Path, commit_oid: str) -> None:
     else:
         # Detached HEAD: update HEAD directly
         head_path.write_text(commit_oid + "\n")
+
+    invalidate_head_cache(hst_dir)
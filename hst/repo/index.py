@@ -1,20 +1,59 @@
 import json
+import os
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 
 
 def read_index(hst_dir: Path) -> Dict[str, str]:
     """Read the index file into a path->oid mapping."""
-    index_path = hst_dir / "index"
-    if not index_path.exists():
+    index_path = os.path.join(str(hst_dir), "index")
+    try:
+        with open(index_path, "rb") as f:
+            return json.loads(f.read())
+    except OSError:
         return {}
 
-    with open(index_path, "r") as f:
-        return json.load(f)
-
 
 def write_index(hst_dir: Path, index: Dict[str, str]) -> None:
-    """Write the index mapping to disk."""
-    index_path = hst_dir / "index"
-    index_path.parent.mkdir(parents=True, exist_ok=True)
-    index_path.write_text(json.dumps(index, indent=2))
+    """Write the index mapping to disk.
+
+    Compact separators rather than indent=2: the file is machine-read on
+    every command, and skipping the pretty-printer roughly halves both
+    the serialization time and the bytes written for large indexes.
+
+    The whole index lands in one temp-file write + fsync + rename, so a
+    crash mid-checkout leaves the old index intact rather than a
+    truncated one, and the entire update costs a single fsync no matter
+    how many entries changed.
+    """
+    index_path = os.path.join(str(hst_dir), "index")
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(json.dumps(index, separators=(",", ":")))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, index_path)
+
+
+def read_stat_cache(hst_dir: Path) -> Dict[str, List]:
+    """Read the stat cache into a path->[mtime_ns, size, ino, oid] mapping.
+
+    The stat cache lives alongside the index and records the mtime, size,
+    and inode each file had when its blob OID was last computed. A file
+    whose stat still matches can be assumed unchanged without re-reading or
+    re-hashing it.
+    """
+    cache_path = os.path.join(str(hst_dir), "stat_cache")
+    try:
+        with open(cache_path, "rb") as f:
+            return json.loads(f.read())
+    except (OSError, json.JSONDecodeError):
+        # A corrupt or unreadable cache just means we re-hash everything
+        return {}
+
+
+def write_stat_cache(hst_dir: Path, stat_cache: Dict[str, List]) -> None:
+    """Write the stat cache mapping to disk."""
+    cache_path = hst_dir / "stat_cache"
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_text(json.dumps(stat_cache, separators=(",", ":")))
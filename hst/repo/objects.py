@@ -1,71 +1,304 @@
+import os
+from collections import OrderedDict
 from pathlib import Path
+import weakref
 import zlib
 from typing import Optional, Type
-from hst.components import Object, Tree
+from hst.components import Blob, Object, Tree, Commit
+
+
+# Hash-consing table for parsed trees and commits: objects are immutable
+# and content-addressed, so one shared instance per OID is safe (even
+# across repositories). Weak values let instances die once nothing else
+# holds them. Blobs are excluded so large file contents don't linger.
+_parsed_object_cache: "weakref.WeakValueDictionary[str, Object]" = (
+    weakref.WeakValueDictionary()
+)
+
+# Bounded LRU for small blobs, separate from the weak table above so file
+# contents can be retained deliberately: operations that replay commits
+# (rebase, repeated checkouts) re-read the same blobs, and a hit replaces
+# a disk read + zlib decompress with a dict lookup. Only blobs up to
+# _BLOB_CACHE_MAX_SIZE are kept so the cache's memory stays bounded by
+# entries x size.
+_blob_cache: "OrderedDict[str, Blob]" = OrderedDict()
+_BLOB_CACHE_MAX_ENTRIES = 1024
+_BLOB_CACHE_MAX_SIZE = 256 * 1024
+
+# Streamed writes at or above this size preallocate their extents up
+# front; below it the extra syscall isn't worth it
+_FALLOCATE_MIN_SIZE = 1024 * 1024
 
 
 def read_object(
     hst_dir: Path, oid: str, cls: Type[Object], store: bool = False
 ) -> Optional[Object]:
-    """Read and decompress an object by OID into the given class."""
-    obj_path = hst_dir / "objects" / oid[:2] / oid[2:]
-    if not obj_path.exists():
+    """Read and decompress an object by OID into the given class.
+
+    Tree and Commit instances are shared per OID for the life of the
+    process, so repeat reads skip the zlib decompress and reparse.
+    """
+    cacheable = not store and cls in (Tree, Commit)
+    if cacheable:
+        cached = _parsed_object_cache.get(oid)
+        if cached is not None:
+            return cached
+    elif not store and cls is Blob:
+        cached = _blob_cache.get(oid)
+        if cached is not None:
+            _blob_cache.move_to_end(oid)
+            return cached
+
+    # os.path keeps this hot path free of per-call Path construction
+    obj_path = os.path.join(str(hst_dir), "objects", oid[:2], oid[2:])
+    if not os.path.exists(obj_path):
         return None
 
-    data = zlib.decompress(obj_path.read_bytes())
+    # Inflate in 64 KiB chunks with a decompressobj: the header is split
+    # off as soon as the first NUL appears, and the compressed bytes are
+    # never held in full alongside the decompressed content
+    decompressor = zlib.decompressobj()
+    content = bytearray()
+    header_done = False
+    with open(obj_path, "rb") as f:
+        while True:
+            chunk = f.read(64 * 1024)
+            if not chunk:
+                break
+            content += decompressor.decompress(chunk)
+            if not header_done:
+                nul = content.find(b"\x00")
+                if nul >= 0:
+                    del content[: nul + 1]
+                    header_done = True
+    content += decompressor.flush()
+
+    obj = cls.deserialize(bytes(content), store=store)
+    if cacheable:
+        _parsed_object_cache[oid] = obj
+    elif not store and cls is Blob and len(content) <= _BLOB_CACHE_MAX_SIZE:
+        _blob_cache[oid] = obj
+        if len(_blob_cache) > _BLOB_CACHE_MAX_ENTRIES:
+            _blob_cache.popitem(last=False)
+    return obj
+
+
+def _open_for_write(dst_path: str, dir_fd: Optional[int]):
+    """Open dst_path for writing, relative to dir_fd when one is given.
+
+    An openat-style open relative to an already-open directory skips the
+    kernel's walk of every leading path component — per-file savings that
+    add up when checkout writes thousands of files under one root.
+    """
+    if dir_fd is None:
+        return open(dst_path, "wb")
+    fd = os.open(
+        dst_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644, dir_fd=dir_fd
+    )
+    return os.fdopen(fd, "wb")
+
+
+def write_object_to(
+    hst_dir: Path, oid: str, dst_path: str, dir_fd: Optional[int] = None
+) -> bool:
+    """Stream an object's content directly into a destination file.
+
+    Checkout rewrites many files whose bytes are needed nowhere else, so
+    inflating into a Blob and handing its buffer to a second write would
+    hold two copies of every file in memory. This decompresses straight
+    from the loose object into dst_path in 64 KiB chunks, stripping the
+    header on the fly; a blob already in the small-blob LRU is written
+    from the cached bytes instead. dst_path is resolved relative to
+    dir_fd when one is supplied.
+
+    Returns False if the object is missing; OSError from the destination
+    write propagates to the caller.
+    """
+    cached = _blob_cache.get(oid)
+    if cached is not None:
+        _blob_cache.move_to_end(oid)
+        with _open_for_write(dst_path, dir_fd) as dst:
+            dst.write(cached.data)
+        return True
+
+    obj_path = os.path.join(str(hst_dir), "objects", oid[:2], oid[2:])
+    try:
+        src = open(obj_path, "rb")
+    except OSError:
+        return False
+
+    with src, _open_for_write(dst_path, dir_fd) as dst:
+        decompressor = zlib.decompressobj()
+        header = bytearray()
+        header_done = False
+        while True:
+            chunk = src.read(64 * 1024)
+            if not chunk:
+                break
+            data = decompressor.decompress(chunk)
+            if not header_done:
+                header += data
+                nul = header.find(b"\x00")
+                if nul >= 0:
+                    # The header carries the final size ("blob <N>"), so
+                    # big files can reserve their extents in one call
+                    # before any content lands, avoiding incremental
+                    # allocation and fragmentation
+                    try:
+                        size = int(header[:nul].rsplit(b" ", 1)[1])
+                    except (IndexError, ValueError):
+                        size = 0
+                    if size >= _FALLOCATE_MIN_SIZE and hasattr(
+                        os, "posix_fallocate"
+                    ):
+                        try:
+                            os.posix_fallocate(dst.fileno(), 0, size)
+                        except OSError:
+                            pass  # Filesystem doesn't support it; plain writes
+                    dst.write(header[nul + 1 :])
+                    header_done = True
+            else:
+                dst.write(data)
+        tail = decompressor.flush()
+        if header_done:
+            dst.write(tail)
+        else:
+            header += tail
+            nul = header.find(b"\x00")
+            if nul >= 0:
+                dst.write(header[nul + 1 :])
+    return True
+
+
+def read_commit_parents(hst_dir: Path, oid: str) -> Optional[list]:
+    """Read only the parent OIDs of a commit, skipping the full deserialize.
+
+    Graph traversals (merge base, ancestry checks) just follow parent edges,
+    so there is no need to decode the author/committer/message fields or
+    allocate a Commit object for every visited node.
+    """
+    obj_path = os.path.join(str(hst_dir), "objects", oid[:2], oid[2:])
+    try:
+        with open(obj_path, "rb") as f:
+            data = zlib.decompress(f.read())
+    except OSError:
+        return None
     header, _, content = data.partition(b"\x00")
-    return cls.deserialize(content, store=store)
+    if not header.startswith(b"commit"):
+        return None
+
+    parents = []
+    for line in content.split(b"\n"):
+        if not line:
+            break  # Blank line ends the headers
+        if line.startswith(b"parent "):
+            parent = line[7:].decode()
+            if parent and parent != "None":
+                parents.append(parent)
+    return parents
 
 
-def build_tree(repo_root: Path, index: dict, base_path: Optional[Path] = None) -> Tree:
+def build_tree(repo_root: Path, index: dict) -> Tree:
     """
-    Recursively build a tree object from the index.
+    Build the root tree object from the index.
 
     index: mapping from relative paths (str) to blob OIDs
-    base_path: current directory relative to repo_root
+
+    The index is walked exactly once: each path is split on "/" and slotted
+    into a nested dict of directories, then trees are emitted bottom-up from
+    that structure. The old version rescanned the full index at every
+    directory level, which was quadratic in deep layouts.
     """
-    if base_path is None:
-        base_path = Path("")
+    # Nested dict mirroring the directory structure: a str value is a blob
+    # OID, a dict value is a subdirectory
+    root: dict = {}
+    for path_str, blob_oid in index.items():
+        parts = path_str.split("/")
+        node = root
+        for name in parts[:-1]:
+            node = node.setdefault(name, {})
+        node[parts[-1]] = blob_oid
 
-    entries = []
+    def emit(node: dict) -> Tree:
+        entries = []
+        for name, value in node.items():
+            if isinstance(value, dict):
+                # Tree stores itself on creation
+                entries.append(("040000", name, emit(value).oid()))
+            else:
+                entries.append(("100644", name, value))
+        # Sort entries by name (like Git does)
+        entries.sort(key=lambda x: x[1])
+        return Tree(entries)
 
-    # Find all direct children (files and subdirectories) under base_path
-    direct_children = {}  # name -> oid (for files) or None (for directories)
+    return emit(root)
 
-    for path_str, blob_oid in index.items():
-        path = Path(path_str)
-
-        # Skip if not under current base_path
-        if base_path != Path(""):
-            try:
-                rel_path = path.relative_to(base_path)
-            except ValueError:
-                continue
+
+def _flatten_tree(hst_dir: Path, tree_oid: str, prefix: str = "") -> dict:
+    """Flatten a tree (nested, flat, or mixed) into {path: blob_oid}."""
+    mapping = {}
+    tree_obj = read_object(hst_dir, tree_oid, Tree, store=False)
+    if not tree_obj:
+        return mapping
+    for mode, name, oid in tree_obj.entries:
+        if mode == "040000":
+            mapping.update(_flatten_tree(hst_dir, oid, prefix + name + "/"))
         else:
-            rel_path = path
-
-        # Get the immediate child name
-        if len(rel_path.parts) == 1:
-            # This is a direct file child
-            direct_children[rel_path.parts[0]] = blob_oid
-        elif len(rel_path.parts) > 1:
-            # This indicates a subdirectory
-            subdir_name = rel_path.parts[0]
-            if subdir_name not in direct_children:
-                direct_children[subdir_name] = None  # Mark as directory
-
-    # Process direct children
-    for name, oid in direct_children.items():
-        if oid is not None:
-            # It's a file
-            entries.append(("100644", name, oid))
+            mapping[prefix + name] = oid
+    return mapping
+
+
+def apply_changes_to_tree(
+    hst_dir: Path, tree_oid: Optional[str], changes: dict
+) -> Optional[str]:
+    """
+    Apply path-level changes to an existing tree, reusing unchanged subtrees.
+
+    changes: mapping from relative paths (str) to blob OIDs, where a value of
+    None means the path is deleted. Only the subtrees along changed paths are
+    rebuilt; every other entry keeps its existing OID by reference.
+
+    Returns the OID of the new tree, or None if the tree ends up empty.
+    """
+    entries = {}
+    if tree_oid:
+        tree_obj = read_object(hst_dir, tree_oid, Tree, store=False)
+        if tree_obj:
+            if any("/" in name for _, name, _ in tree_obj.entries):
+                # Flat trees (merge commits historically stored "dir/file"
+                # entries at a single level) can't be patched per component:
+                # the stale flat entry would survive alongside the rebuilt
+                # subtree. Flatten the whole tree, fold the changes in, and
+                # rebuild nested from scratch.
+                merged = _flatten_tree(hst_dir, tree_oid)
+                merged.update(changes)
+                return apply_changes_to_tree(hst_dir, None, merged)
+            entries = {name: (mode, oid) for mode, name, oid in tree_obj.entries}
+
+    # Group changes by their first path component
+    sub_changes = {}
+    for path, blob_oid in changes.items():
+        name, _, rest = path.partition("/")
+        if rest:
+            sub_changes.setdefault(name, {})[rest] = blob_oid
+        elif blob_oid is None:
+            entries.pop(name, None)
         else:
-            # It's a directory - recursively build its tree
-            subdir_path = base_path / name if base_path != Path("") else Path(name)
-            sub_tree = build_tree(repo_root, index, subdir_path)
-            sub_oid = sub_tree.oid()  # Tree stores itself on creation
-            entries.append(("040000", name, sub_oid))
-
-    # Sort entries by name (like Git does)
-    entries.sort(key=lambda x: x[1])
-    return Tree(entries)
+            entries[name] = ("100644", blob_oid)
+
+    # Rebuild only the subtrees that contain changes
+    for name, nested in sub_changes.items():
+        existing = entries.get(name)
+        sub_oid = existing[1] if existing and existing[0] == "040000" else None
+        new_sub_oid = apply_changes_to_tree(hst_dir, sub_oid, nested)
+        if new_sub_oid is None:
+            entries.pop(name, None)
+        else:
+            entries[name] = ("040000", new_sub_oid)
+
+    if not entries:
+        return None
+
+    tree_entries = [(mode, name, oid) for name, (mode, oid) in entries.items()]
+    tree_entries.sort(key=lambda x: x[1])
+    return Tree(tree_entries).oid()
@@ -1,9 +1,18 @@
+import os
+from collections import deque
 from pathlib import Path
-from typing import Optional
-from hst.repo.objects import read_object
+from typing import Dict, FrozenSet, Optional
+from hst.repo.objects import read_object, read_commit_parents
 from hst.components import Commit
 
 
+# Full ancestor closures keyed by commit OID. Commits are immutable, so a
+# commit's ancestry never changes and the cache needs no invalidation;
+# repeated ancestry queries against the same commit in one process cost
+# one walk total.
+_ancestor_cache: Dict[str, FrozenSet[str]] = {}
+
+
 def resolve_commit_ref(hst_dir: Path, commit_ref: str) -> Optional[str]:
     """
     Resolve a commit reference to a commit hash.
@@ -28,21 +37,23 @@ def resolve_commit_ref(hst_dir: Path, commit_ref: str) -> Optional[str]:
         if commit_obj:
             return commit_ref
 
-    # Try as short commit hash (expand to full hash)
+    # Try as short commit hash (expand to full hash). The first two
+    # characters name the fan-out directory, so only that one directory
+    # is listed instead of iterating every prefix under objects/
     if len(commit_ref) >= 7:
-        objects_dir = hst_dir / "objects"
-        if objects_dir.exists():
-            for subdir in objects_dir.iterdir():
-                if subdir.is_dir() and subdir.name == commit_ref[:2]:
-                    for obj_file in subdir.iterdir():
-                        full_hash = subdir.name + obj_file.name
-                        if full_hash.startswith(commit_ref):
-                            # Verify it's a commit
-                            commit_obj = read_object(
-                                hst_dir, full_hash, Commit, store=False
-                            )
-                            if commit_obj:
-                                return full_hash
+        prefix_dir = os.path.join(str(hst_dir), "objects", commit_ref[:2])
+        rest = commit_ref[2:]
+        try:
+            candidates = os.listdir(prefix_dir)
+        except OSError:
+            candidates = []
+        for name in candidates:
+            if len(name) == 38 and name.startswith(rest):
+                full_hash = commit_ref[:2] + name
+                # Verify it's a commit
+                commit_obj = read_object(hst_dir, full_hash, Commit, store=False)
+                if commit_obj:
+                    return full_hash
 
     # Try as remote branch name (remote/branch format)
     if "/" in commit_ref:
@@ -64,6 +75,55 @@ def resolve_commit_ref(hst_dir: Path, commit_ref: str) -> Optional[str]:
     return None
 
 
+def find_merge_base(
+    hst_dir: Path, commit1_oid: str, commit2_oid: str
+) -> Optional[str]:
+    """
+    Find the merge base (first common ancestor) of two commits.
+
+    Alternates one breadth-first step from each side, streaming parent OIDs
+    into the frontier as commits are visited, so each commit is read at most
+    once and the walk stops as soon as the frontiers meet.
+
+    Args:
+        hst_dir: Path to the .hst directory
+        commit1_oid: First commit hash
+        commit2_oid: Second commit hash
+
+    Returns:
+        Commit hash of the merge base, or None if there is no common ancestor
+    """
+    visited1 = set()
+    visited2 = set()
+    queue1 = deque([commit1_oid])
+    queue2 = deque([commit2_oid])
+
+    while queue1 or queue2:
+        # Advance the frontier from the first commit
+        if queue1:
+            current = queue1.popleft()
+            if current in visited2:
+                return current
+            if current not in visited1:
+                visited1.add(current)
+                parents = read_commit_parents(hst_dir, current)
+                if parents:
+                    queue1.extend(parents)
+
+        # Advance the frontier from the second commit
+        if queue2:
+            current = queue2.popleft()
+            if current in visited1:
+                return current
+            if current not in visited2:
+                visited2.add(current)
+                parents = read_commit_parents(hst_dir, current)
+                if parents:
+                    queue2.extend(parents)
+
+    return None
+
+
 def is_ancestor(hst_dir: Path, ancestor_oid: str, descendant_oid: str) -> bool:
     """
     Check if ancestor_oid is an ancestor of descendant_oid.
@@ -81,22 +141,28 @@ def is_ancestor(hst_dir: Path, ancestor_oid: str, descendant_oid: str) -> bool:
     if ancestor_oid == descendant_oid:
         return True
 
-    visited = set()
-    queue = [descendant_oid]
+    cached = _ancestor_cache.get(descendant_oid)
+    if cached is not None:
+        return ancestor_oid in cached
 
-    while queue:
-        current_oid = queue.pop(0)
-
-        if current_oid in visited:
-            continue
-        visited.add(current_oid)
-
-        if current_oid == ancestor_oid:
-            return True
+    # Deque gives O(1) pops, and marking OIDs visited at enqueue time keeps
+    # each commit in the queue (and its object read) at most once. The walk
+    # runs to completion (no early exit) so the visited set is the full
+    # ancestor closure and can answer every later query about this commit.
+    visited = {descendant_oid}
+    queue = deque([descendant_oid])
 
-        # Read the commit and add its parents to the queue
-        commit_obj = read_object(hst_dir, current_oid, Commit, store=False)
-        if commit_obj and commit_obj.parents:
-            queue.extend(commit_obj.parents)
-
-    return False
+    while queue:
+        current_oid = queue.popleft()
+
+        # Follow parent edges; only the commit headers are parsed
+        parents = read_commit_parents(hst_dir, current_oid)
+        if parents:
+            for parent in parents:
+                if parent not in visited:
+                    visited.add(parent)
+                    queue.append(parent)
+
+    closure = frozenset(visited)
+    _ancestor_cache[descendant_oid] = closure
+    return ancestor_oid in closure
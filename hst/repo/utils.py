@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from typing import List
 
@@ -9,6 +10,10 @@ def parse_path_arguments(argv: List[str], repo_root: Path) -> List[str]:
     Returns a list of normalized relative paths from repo root.
     Filters out paths that are outside the repository or cannot be resolved.
 
+    The loop works on plain strings (os.path.realpath plus a prefix
+    compare), so shell-glob expansions with thousands of arguments don't
+    pay for a Path construction and parts-parse per argument.
+
     Args:
         argv: List of path arguments from command line
         repo_root: Root path of the repository
@@ -16,28 +21,23 @@ def parse_path_arguments(argv: List[str], repo_root: Path) -> List[str]:
     Returns:
         List of normalized relative paths from repo root
     """
+    repo_root_str = os.fspath(repo_root)
+    repo_prefix = repo_root_str + os.sep
+    cwd = os.getcwd()
+
     filter_paths = []
     for arg in argv:
-        path = Path(arg)
-
-        # Convert to absolute path
-        if not path.is_absolute():
-            path = Path.cwd() / path
-
-        # Normalize the path
-        try:
-            path = path.resolve()
-        except (OSError, RuntimeError):
-            print(f"Warning: Cannot resolve path '{arg}', skipping")
-            continue
-
-        # Check if path is within repo
-        try:
-            rel_path = path.relative_to(repo_root)
-            filter_paths.append(str(rel_path))
-        except ValueError:
+        # Resolve symlinks and normalize, like Path.resolve()
+        resolved = os.path.realpath(arg if os.path.isabs(arg) else os.path.join(cwd, arg))
+
+        if resolved == repo_root_str:
+            # "." is the repo-root pathspec; the matchers below and
+            # _find_matching_files all treat it as match-everything
+            filter_paths.append(".")
+        elif resolved.startswith(repo_prefix):
+            filter_paths.append(resolved[len(repo_prefix):])
+        else:
             print(f"Warning: Path '{arg}' is not within the repository, skipping")
-            continue
 
     return filter_paths
 
@@ -59,6 +59,13 @@ def filter_dict_by_paths(
     if not filter_paths:
         return data_dict
 
+    # The standard matcher gets a fused fast path: precompute the
+    # exact-set/prefix-tuple matcher once and run a dict comprehension,
+    # rather than paying a Python call and prefix rebuild per entry
+    if path_filter_func is path_matches_filter:
+        matches = build_pathspec_matcher(filter_paths)
+        return {path: value for path, value in data_dict.items() if matches(path)}
+
     filtered = {}
     for path, value in data_dict.items():
         if path_filter_func(path, filter_paths):
@@ -66,23 +73,75 @@ def filter_dict_by_paths(
     return filtered
 
 
-def path_matches_filter(file_path: str, filter_paths: List[str]) -> bool:
+# Above this many filters, per-path cost is dominated by the O(filters)
+# startswith scan; switch to probing the path's own ancestors instead
+_ANCESTOR_PROBE_MIN_FILTERS = 16
+
+
+def build_pathspec_matcher(filter_paths: List[str]):
     """
-    Check if a file path should be included based on filter paths.
-    Returns True if the file_path matches any of the filter_paths.
+    Build a fast path matcher from a list of filter paths.
+
+    Precomputes an exact-match set and a tuple of directory prefixes once,
+    so each path tests with a single set lookup plus one C-level
+    str.startswith over all prefixes -- instead of re-splitting every filter
+    into parts for every path checked.
+
+    With many filters the startswith scan is O(filters) per path, so large
+    filter lists flip to the inverse test: walk the path's own ancestor
+    directories (there are only depth of them) and probe each against the
+    filter set -- the flattened form of a prefix trie.
+
+    Returns a callable (path) -> bool with the same semantics as
+    path_matches_filter.
     """
-    file_path_parts = Path(file_path).parts
+    exact = frozenset(filter_paths)
 
-    for filter_path in filter_paths:
-        filter_path_parts = Path(filter_path).parts
+    # "." (and the empty string) mean the whole repo -- parse_path_arguments
+    # emits "." for the repo root and _find_matching_files treats it the
+    # same way -- so any such filter matches everything
+    if "." in exact or "" in exact:
+        return lambda path: True
 
-        # Exact match
-        if file_path == filter_path:
-            return True
+    if len(exact) > _ANCESTOR_PROBE_MIN_FILTERS:
 
-        # Check if file is under a directory filter
-        if len(file_path_parts) >= len(filter_path_parts):
-            if file_path_parts[: len(filter_path_parts)] == filter_path_parts:
+        def matches(path: str) -> bool:
+            if path in exact:
                 return True
+            sep = path.find("/")
+            while sep != -1:
+                if path[:sep] in exact:
+                    return True
+                sep = path.find("/", sep + 1)
+            return False
 
-    return False
+        return matches
+
+    prefixes = tuple(f"{filter_path}/" for filter_path in filter_paths)
+
+    def matches(path: str) -> bool:
+        return path in exact or path.startswith(prefixes)
+
+    return matches
+
+
+def path_matches_filter(file_path: str, filter_paths: List[str]) -> bool:
+    """
+    Check if a file path should be included based on filter paths.
+    Returns True if the file_path matches any of the filter_paths.
+
+    Paths are the normalized "/"-separated strings used throughout the
+    repo, so plain string comparison replaces the old Path.parts tuples
+    (two Path constructions and tuple allocations per check).
+    """
+    # "." and "" mean the whole repo (Path(".").parts was an empty tuple
+    # under the old parts-prefix compare, which matched every path)
+    if "." in filter_paths or "" in filter_paths:
+        return True
+
+    # Exact match, or file is under a directory filter; the tuple form of
+    # startswith tests every prefix in one C call
+    if file_path in filter_paths:
+        return True
+    prefixes = tuple(f"{filter_path}/" for filter_path in filter_paths)
+    return bool(prefixes) and file_path.startswith(prefixes)
@@ -1,16 +1,30 @@
+import hashlib
+import json
+import mmap
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List
 from hst.repo import HST_DIRNAME
-from hst.repo.objects import read_object
-from hst.repo.utils import path_matches_filter
+from hst.repo.objects import read_object, write_object_to
+from hst.repo.utils import build_pathspec_matcher
 from hst.repo.index import write_index, read_index
+from hst.repo.config import read_config
 from hst.repo.head import get_current_commit_oid
-from hst.components import Commit, Tree, Blob
+from hst.components import Commit, Tree, Blob, hash_blob_bytes
 
 
-def checkout_commit(hst_dir: Path, repo_root: Path, commit_oid: str):
+def checkout_commit(hst_dir: Path, repo_root: Path, commit_oid: str, force: bool = False):
     """
     Update the working directory and index to match the given commit.
+
+    By default only the difference between the index and the target tree
+    is applied: files whose blob OID already matches are left untouched,
+    so switching between related commits costs the size of the diff, not
+    the worktree. With force=True the worktree is cleared and rebuilt in
+    full — for callers that need to discard state the index doesn't
+    reflect (e.g. aborting a conflicted merge).
     """
     # Read the commit object
     commit_obj = read_object(hst_dir, commit_oid, Commit, store=False)
@@ -21,11 +35,15 @@ def checkout_commit(hst_dir: Path, repo_root: Path, commit_oid: str):
     # Get the tree mapping from the commit
     tree_mapping = read_tree_recursive(hst_dir, commit_obj.tree)
 
-    # Clear current working directory (except .hst)
-    clear_working_directory(repo_root)
-
-    # Restore files from the tree
-    restore_files_from_tree(hst_dir, repo_root, tree_mapping)
+    if force:
+        # Clear current working directory (except .hst) and rebuild
+        clear_working_directory(repo_root)
+        restore_files_from_tree(hst_dir, repo_root, tree_mapping)
+    else:
+        # Touch only the paths that differ from what the index records
+        apply_tree_diff_to_worktree(
+            hst_dir, repo_root, read_index(hst_dir), tree_mapping
+        )
 
     # Update index to match the tree
     write_index(hst_dir, tree_mapping)
@@ -55,41 +73,150 @@ def checkout_from_commit(hst_dir: Path, repo_root: Path, commit_oid: str):
     return True
 
 
-def read_tree_recursive(hst_dir: Path, tree_oid: str, prefix="") -> Dict[str, str]:
+# Tree OIDs are content-addressed and immutable, so the flattened mapping is
+# a pure function of the OID; memoizing it means each (sub)tree object is
+# read and parsed at most once per process, even across commits that share
+# subtrees.
+_flat_tree_cache: Dict[str, Dict[str, str]] = {}
+
+
+# Fan subtree reads out to threads only when a node has more siblings
+# than this (reads and zlib release the GIL, so they overlap)
+_PARALLEL_TREE_MIN_SUBTREES = 4
+
+
+def read_tree_recursive(
+    hst_dir: Path, tree_oid: str, prefix="", _parallel=True
+) -> Dict[str, str]:
     """Recursively read a tree object into {path: blob_oid}."""
-    tree_obj = read_object(hst_dir, tree_oid, Tree, store=False)
-    mapping = {}
-    if not tree_obj:
-        return mapping
+    cached = _flat_tree_cache.get(tree_oid)
+    if cached is None:
+        cached = {}
+        tree_obj = read_object(hst_dir, tree_oid, Tree, store=False)
+        if tree_obj:
+            subtrees = []
+            for mode, name, child_oid in tree_obj.entries:
+                if mode == "040000":  # sub-tree
+                    subtrees.append((name, child_oid))
+                else:
+                    # Interning collapses duplicate OID strings (renames,
+                    # identical files) to one object across every mapping
+                    # held at once, and makes equality checks pointer-fast
+                    cached[name] = sys.intern(child_oid)
+
+            # Sibling subtrees are independent; read them in parallel at
+            # the top level only (children recurse serially) so deep
+            # trees don't stack nested pools
+            if _parallel and len(subtrees) > _PARALLEL_TREE_MIN_SUBTREES:
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    sub_mappings = list(
+                        executor.map(
+                            lambda child: read_tree_recursive(
+                                hst_dir, child, _parallel=False
+                            ),
+                            [child_oid for _, child_oid in subtrees],
+                        )
+                    )
+            else:
+                sub_mappings = [
+                    read_tree_recursive(hst_dir, child_oid, _parallel=False)
+                    for _, child_oid in subtrees
+                ]
+
+            for (name, _), sub_mapping in zip(subtrees, sub_mappings):
+                for sub_path, blob_oid in sub_mapping.items():
+                    cached[f"{name}/{sub_path}"] = blob_oid
+        _flat_tree_cache[tree_oid] = cached
+
+    if not prefix:
+        # Hand out a copy so callers can't mutate the cached mapping
+        return dict(cached)
+    return {f"{prefix}{path}": blob_oid for path, blob_oid in cached.items()}
+
+
+def tree_contains_path(hst_dir: Path, tree_oid: str, rel_path: str):
+    """
+    Look up a single path in a tree, descending only the matching subtrees.
 
-    for mode, name, child_oid in tree_obj.entries:
-        path = f"{prefix}{name}"
-        if mode == "040000":  # sub-tree
-            mapping.update(read_tree_recursive(hst_dir, child_oid, prefix=f"{path}/"))
+    Returns the blob OID for rel_path, or None if the tree doesn't contain
+    it. Answering one membership question this way costs O(depth) object
+    reads instead of flattening the whole tree first.
+
+    Some trees store file entries under their full "dir/file" path at a
+    single level (merge commits historically did this), so before
+    descending into a component the remaining path is also tried as a
+    literal entry name — the same dual shape read_tree_recursive accepts.
+    """
+    components = rel_path.split("/")
+    current_oid = tree_oid
+
+    for i, component in enumerate(components):
+        tree_obj = read_object(hst_dir, current_oid, Tree, store=False)
+        if not tree_obj:
+            return None
+
+        if i < len(components) - 1:
+            remaining = "/".join(components[i:])
+            for mode, name, child_oid in tree_obj.entries:
+                if name == remaining and mode != "040000":
+                    return child_oid
+
+        for mode, name, child_oid in tree_obj.entries:
+            if name != component:
+                continue
+            if i == len(components) - 1:
+                # Last component must be a file entry
+                return None if mode == "040000" else child_oid
+            if mode != "040000":
+                return None  # Path continues but this entry isn't a directory
+            current_oid = child_oid
+            break
         else:
-            mapping[path] = child_oid
-    return mapping
+            return None
+
+    return None
 
 
 def clear_working_directory(repo_root: Path):
     """
     Remove all files in the working directory except .hst.
+
+    One os.walk replaces the old pair of rglob passes: .hst is pruned
+    from dirnames before descent (so the object store is never scanned),
+    files are unlinked as each directory is visited, and directories are
+    rmdir'd afterwards deepest-first — emptiness falls out of the order,
+    with no re-listing.
     """
-    for path in repo_root.rglob("*"):
-        if path.is_file() and HST_DIRNAME not in path.parts:
+    repo_root_str = str(repo_root)
+    visited_dirs = []
+    warnings = []
+    for dirpath, dirnames, filenames in os.walk(repo_root_str):
+        if HST_DIRNAME in dirnames:
+            dirnames.remove(HST_DIRNAME)  # Never descend into .hst
+        for name in filenames:
             try:
-                path.unlink()
+                os.unlink(os.path.join(dirpath, name))
             except OSError as e:
-                print(f"Warning: Could not remove {path}: {e}")
+                warnings.append(
+                    f"Warning: Could not remove {os.path.join(dirpath, name)}: {e}"
+                )
+        if dirpath != repo_root_str:
+            visited_dirs.append(dirpath)
+
+    if warnings:
+        sys.stdout.write("\n".join(warnings) + "\n")
+
+    # A top-down walk yields parents before children, so reversed order
+    # removes children first
+    for dirpath in reversed(visited_dirs):
+        try:
+            os.rmdir(dirpath)  # Fails harmlessly if anything is left
+        except OSError:
+            pass
 
-    # Remove empty directories (but not .hst)
-    for path in sorted(repo_root.rglob("*"), key=lambda p: len(p.parts), reverse=True):
-        if path.is_dir() and path.name != HST_DIRNAME and HST_DIRNAME not in path.parts:
-            try:
-                if not any(path.iterdir()):  # Only remove if empty
-                    path.rmdir()
-            except OSError:
-                pass  # Directory not empty or other error, skip
+
+# Below this many files, restoring serially beats thread-pool startup
+_PARALLEL_RESTORE_MIN_FILES = 32
 
 
 def restore_files_from_tree(
@@ -97,74 +224,349 @@ def restore_files_from_tree(
 ):
     """
     Restore files in the working directory from the tree mapping.
+
+    Parent directories are created in one serial deduplicated pass, then
+    the per-file work (blob read + decompress + write) fans out to a
+    thread pool for large restores — each file is independent and the
+    I/O syscalls and zlib release the GIL, so the disk waits overlap.
     """
-    for file_path, blob_oid in tree_mapping.items():
-        # Read the blob object
-        blob_obj = read_object(hst_dir, blob_oid, Blob, store=False)
-        if not blob_obj:
-            print(f"Warning: Could not read blob {blob_oid} for {file_path}")
-            continue
+    repo_root_str = str(repo_root)
+
+    # Create parent directories up front so workers never race on mkdir
+    parent_dirs = {
+        os.path.dirname(os.path.join(repo_root_str, file_path))
+        for file_path in tree_mapping
+    }
+    for parent in sorted(parent_dirs, key=len):
+        os.makedirs(parent, exist_ok=True)
+
+    # One open directory handle for the whole restore: workers then open
+    # destinations relative to it (openat), so the kernel skips walking
+    # the repo-root components again for every file
+    root_fd = None
+    if os.open in os.supports_dir_fd:
+        try:
+            root_fd = os.open(repo_root_str, os.O_RDONLY)
+        except OSError:
+            pass
+
+    # Workers append warnings instead of printing, so the stdout lock is
+    # never a serialization point inside the pool; everything is emitted
+    # in one write at the end (list.append is atomic under the GIL)
+    warnings = []
+
+    def restore_one(item):
+        file_path, blob_oid = item
+        # Stream the blob straight from the object store into the file;
+        # the content is never materialized as a Python bytes object
+        dst = (
+            file_path
+            if root_fd is not None
+            else os.path.join(repo_root_str, file_path)
+        )
+        try:
+            if not write_object_to(hst_dir, blob_oid, dst, dir_fd=root_fd):
+                warnings.append(
+                    f"Warning: Could not read blob {blob_oid} for {file_path}"
+                )
+        except OSError as e:
+            warnings.append(f"Warning: Could not write {file_path}: {e}")
+
+    # Sorted order clusters siblings, so consecutive writes hit the same
+    # directory and keep its dentries hot instead of bouncing around the
+    # tree in index-insertion order
+    items = sorted(tree_mapping.items())
+
+    try:
+        if len(items) > _PARALLEL_RESTORE_MIN_FILES:
+            workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for _ in executor.map(restore_one, items):
+                    pass
+        else:
+            for item in items:
+                restore_one(item)
+    finally:
+        if root_fd is not None:
+            os.close(root_fd)
 
-        # Create the full path
-        full_path = repo_root / file_path
+    if warnings:
+        sys.stdout.write("\n".join(warnings) + "\n")
 
-        # Create parent directories if needed
-        full_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Write the file content
-        try:
-            full_path.write_bytes(blob_obj.data)
-        except OSError as e:
-            print(f"Warning: Could not write {file_path}: {e}")
+def apply_tree_diff_to_worktree(
+    hst_dir: Path, repo_root: Path, old_tree: Dict[str, str], new_tree: Dict[str, str]
+):
+    """
+    Update the working directory from old_tree to new_tree.
+
+    Only paths whose blob OID differs are rewritten and paths missing from
+    new_tree are removed; files identical in both trees are left untouched,
+    so the cost scales with the size of the diff rather than the worktree.
+    """
+    # Remove files that are gone in new_tree, pruning now-empty directories
+    for file_path in old_tree:
+        if file_path not in new_tree:
+            full_path = repo_root / file_path
+            try:
+                full_path.unlink()
+            except OSError as e:
+                print(f"Warning: Could not remove {file_path}: {e}")
+                continue
+
+            parent = full_path.parent
+            while parent != repo_root and parent.name != HST_DIRNAME:
+                try:
+                    parent.rmdir()  # Fails (and stops) if not empty
+                except OSError:
+                    break
+                parent = parent.parent
+
+    # Write only the files whose content actually changed
+    changed = {
+        file_path: blob_oid
+        for file_path, blob_oid in new_tree.items()
+        if old_tree.get(file_path) != blob_oid
+    }
+    restore_files_from_tree(hst_dir, repo_root, changed)
+
+
+# Below this many dirty files, thread-pool startup costs more than it saves
+_PARALLEL_HASH_MIN_FILES = 32
+
+# Files at or above this size are hashed through mmap instead of read();
+# below it the mmap setup costs more than the copy it avoids
+_MMAP_HASH_MIN_SIZE = 32 * 1024
+
+# OID of the empty blob -- empty files skip hashing entirely
+_EMPTY_BLOB_OID = "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"
+
+
+def _hash_file_streaming(f, size: int) -> str:
+    """Hash an open file into a blob OID without materializing it.
+
+    file_digest (3.11+) drives the read loop at the C/stdlib level and
+    accepts a callable, so the context can be pre-seeded with the blob
+    header before the file bytes are fed in. Older interpreters fall
+    back to a plain chunked update loop.
+    """
+    h = hashlib.sha1(b"blob %d\x00" % size)
+    if hasattr(hashlib, "file_digest"):
+        hashlib.file_digest(f, lambda: h)
+    else:
+        while chunk := f.read(1024 * 1024):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _preload_enabled(repo_root: Path) -> bool:
+    """Check the core.preloadindex knob (defaults to on, like Git's)."""
+    config = read_config(repo_root / HST_DIRNAME)
+    return config.getboolean("core", "preloadindex", fallback=True)
 
 
 def scan_working_tree(
-    repo_root: Path, filter_paths: List[str] = None, store_blobs: bool = False
+    repo_root: Path,
+    filter_paths: List[str] = None,
+    store_blobs: bool = False,
+    stat_cache: Dict[str, list] = None,
 ) -> Dict[str, str]:
     """
     Walk repo_root (excluding .hst) and hash each file into {path: oid}.
     If filter_paths is provided, only scan files matching those paths.
     If store_blobs is True, blob objects will be stored to disk.
+    If stat_cache is provided (path -> [mtime_ns, size, ino, oid]), files
+    whose mtime, size, and inode still match the cache keep their cached OID
+    without being re-read or re-hashed. The cache is updated in place for
+    re-hashed files.
+
+    Files that do need hashing are processed by a thread pool when there are
+    enough of them (hashlib releases the GIL, so reads and SHA-1 overlap);
+    set core.preloadindex = false in .hst/config to force serial hashing.
+
+    Note: the stat cache is deliberately per-file. A whole-scan cache keyed
+    on directory mtimes would be unsound -- POSIX only bumps a directory's
+    mtime on create/delete/rename, not when a contained file is rewritten
+    in place, so such a cache would miss plain edits.
     """
+    objects_dir = str(repo_root / HST_DIRNAME / "objects")
+    matcher = build_pathspec_matcher(filter_paths) if filter_paths else None
+    to_hash = []  # (rel_path, abs_path, stat-or-None) for files needing a hash
     mapping = {}
-    for path in repo_root.rglob("*"):
-        if path.is_file() and HST_DIRNAME not in path.parts:
-            rel_path = str(path.relative_to(repo_root))
 
-            # Apply path filter if specified
-            if filter_paths and not path_matches_filter(rel_path, filter_paths):
-                continue
+    # Explicit scandir-based walk: DirEntry caches its stat result, so
+    # is_dir/is_file cost no extra syscalls, .hst is pruned at the directory
+    # level, and relative paths are accumulated instead of recomputed.
+    stack = [(str(repo_root), "")]
+    while stack:
+        dir_path, rel_prefix = stack.pop()
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.name == HST_DIRNAME:
+                    continue
+                rel_path = rel_prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, rel_path + "/"))
+                    continue
+                if not entry.is_file():
+                    continue
+
+                # Apply path filter before touching file contents
+                if matcher and not matcher(rel_path):
+                    continue
+
+                # Skip unchanged files based on the stat cache
+                stat = None
+                if stat_cache is not None:
+                    stat = entry.stat()
+                    cached = stat_cache.get(rel_path)
+                    if (
+                        cached
+                        and len(cached) == 4
+                        and cached[0] == stat.st_mtime_ns
+                        and cached[1] == stat.st_size
+                        and cached[2] == stat.st_ino
+                    ):
+                        oid = cached[3]
+                        # A cached OID may come from a scan that didn't store
+                        # blobs; only trust it here if the object exists
+                        if not store_blobs or os.path.exists(
+                            os.path.join(objects_dir, oid[:2], oid[2:])
+                        ):
+                            mapping[rel_path] = oid
+                            continue
+
+                to_hash.append((rel_path, entry.path, stat))
+
+    # Hashing goes through hashlib, which dispatches to OpenSSL's
+    # assembly SHA-1 (including the SHA-NI hardware path where present);
+    # the Python cost left per file is one call plus the read
+    def hash_file(abs_path: str) -> str:
+        with open(abs_path, "rb") as f:
+            if store_blobs:
+                # Storing needs the bytes in hand anyway
+                return Blob(f.read()).oid()
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return _EMPTY_BLOB_OID
+            if size >= _MMAP_HASH_MIN_SIZE:
+                try:
+                    # Hash straight from the mapped pages; no user-space copy
+                    with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                        return hash_blob_bytes(mm)
+                except (ValueError, OSError):
+                    # Some filesystems refuse mmap; stream in 1 MiB slices
+                    # so the whole file is never resident at once
+                    return _hash_file_streaming(f, size)
+            return hash_blob_bytes(f.read())
+
+    # Hash the dirty files, in parallel when there are enough to be worth it
+    if len(to_hash) > _PARALLEL_HASH_MIN_FILES and _preload_enabled(repo_root):
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            oids = list(executor.map(hash_file, (abs_path for _, abs_path, _ in to_hash)))
+    else:
+        oids = [hash_file(abs_path) for _, abs_path, _ in to_hash]
+
+    for (rel_path, _, stat), oid in zip(to_hash, oids):
+        mapping[rel_path] = oid
+        if stat_cache is not None:
+            stat_cache[rel_path] = [stat.st_mtime_ns, stat.st_size, stat.st_ino, oid]
 
-            with open(path, "rb") as f:
-                data = f.read()
-            blob = Blob(data, store=store_blobs)  # Store based on parameter
-            mapping[rel_path] = blob.oid()
     return mapping
 
 
+def _tree_differs_from_index(hst_dir: Path, tree_oid: str, index: Dict[str, str]) -> bool:
+    """Return True as soon as the tree and index are known to differ.
+
+    A full dict comparison would flatten the whole HEAD tree first; this
+    walks it lazily, bailing out at the first path whose OID differs (or
+    that the index lacks), and only falls through to a file count when
+    everything matched — at which point the tree can still hide nothing,
+    so extra index entries are the only remaining difference.
+    """
+    cached = _flat_tree_cache.get(tree_oid)
+    if cached is not None:
+        return index != cached
+
+    index_get = index.get
+    file_count = 0
+    stack = [(tree_oid, "")]
+    while stack:
+        oid, prefix = stack.pop()
+        tree_obj = read_object(hst_dir, oid, Tree, store=False)
+        if not tree_obj:
+            continue
+        for mode, name, child_oid in tree_obj.entries:
+            if mode == "040000":
+                stack.append((child_oid, f"{prefix}{name}/"))
+            else:
+                if index_get(f"{prefix}{name}") != child_oid:
+                    return True
+                file_count += 1
+
+    # Every tree path matched the index; differ only if the index has more
+    return file_count != len(index)
+
+
 def check_for_staged_changes(hst_dir: Path) -> bool:
     """
     Check if there are staged changes that differ from HEAD.
     Returns True if there are staged changes, False otherwise.
+
+    The answer only changes when the index file or HEAD moves, so the
+    result is cached in .hst/status_cache keyed by the index mtime and
+    the HEAD commit OID; repeat guard checks (switch, branch) skip the
+    HEAD tree walk entirely on a hit.
     """
-    # Read current index
-    index = read_index(hst_dir)
+    hst_dir_str = str(hst_dir)
+    try:
+        index_mtime = os.stat(os.path.join(hst_dir_str, "index")).st_mtime_ns
+    except OSError:
+        index_mtime = None
 
-    # Get current commit
     current_commit_oid = get_current_commit_oid(hst_dir)
-    if not current_commit_oid:
-        # No commits yet, any files in index are staged changes
-        return len(index) > 0
 
-    # Read HEAD commit tree
-    commit_obj = read_object(hst_dir, current_commit_oid, Commit, store=False)
-    if not commit_obj:
-        return len(index) > 0
+    cache_path = os.path.join(hst_dir_str, "status_cache")
+    try:
+        with open(cache_path, "rb") as f:
+            cached = json.loads(f.read())
+        if (
+            cached.get("index_mtime") == index_mtime
+            and cached.get("head_oid") == current_commit_oid
+        ):
+            return cached["dirty"]
+    except (OSError, json.JSONDecodeError, KeyError):
+        pass
 
-    head_tree = read_tree_recursive(hst_dir, commit_obj.tree)
+    # Read current index
+    index = read_index(hst_dir)
 
-    # Compare index with HEAD tree
-    return index != head_tree
+    if not current_commit_oid:
+        # No commits yet, any files in index are staged changes
+        dirty = len(index) > 0
+    else:
+        # Read HEAD commit tree
+        commit_obj = read_object(hst_dir, current_commit_oid, Commit, store=False)
+        if not commit_obj:
+            dirty = len(index) > 0
+        else:
+            # Compare index against the HEAD tree with early exit
+            dirty = _tree_differs_from_index(hst_dir, commit_obj.tree, index)
+
+    # Land the cache with a rename so a crashed write can't leave a
+    # truncated file behind
+    payload = json.dumps(
+        {"index_mtime": index_mtime, "head_oid": current_commit_oid, "dirty": dirty}
+    )
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # Cache is best-effort; the computed answer is still correct
+
+    return dirty
 
 
 # End of file